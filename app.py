@@ -1,20 +1,31 @@
 import os
+import gzip
 import json
+import logging
 import uuid
 import datetime
 import re
+import collections
 import requests
 import threading
 import time
+import asyncio
+import concurrent.futures
+import aiohttp
 from typing import Dict, Any, Optional
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, send_file, Response, stream_template, render_template_string
+from contextlib import contextmanager
+import orjson
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, send_file, send_from_directory, Response, stream_template, render_template_string
+from flask.json.provider import JSONProvider
 from werkzeug.utils import secure_filename
-import tempfile
+import io
 from dotenv import load_dotenv
+from flask_caching import Cache
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from psycopg2 import pool
 import urllib.parse
+from requests.adapters import HTTPAdapter, Retry
 
 from parallel import Parallel
 from parallel.types import TaskSpecParam
@@ -23,8 +34,55 @@ from parallel.types import TaskSpecParam
 # Load environment variables
 load_dotenv('.env.local')
 
+# Module logger. Level comes from the environment so debug chatter can be
+# silenced in production; %-style arguments mean silenced messages are
+# never even formatted.
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson so jsonify encodes in native code"""
+
+    # orjson always emits compact, insertion-ordered JSON; declare it so
+    # nothing re-enables the pretty-print/key-sort passes the default
+    # provider used to pay on browser requests
+    compact = True
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-here')
+app.json = ORJSONProvider(app)
+
+# When running behind nginx/gunicorn, let send_file emit X-Sendfile and
+# hand file responses to the kernel (sendfile(2)) instead of pumping the
+# body through Python. In-memory (BytesIO) responses already go through
+# the server's wsgi.file_wrapper; this covers file-backed ones.
+app.use_x_sendfile = os.getenv('USE_X_SENDFILE', '0') == '1'
+
+# On-disk cache of rendered markdown downloads, written when a report is
+# saved. Best effort only: on Vercel everything outside /tmp is read-only,
+# so point REPORTS_CACHE_DIR there or let /download fall back to rendering
+# from the database row.
+REPORTS_CACHE_DIR = os.getenv(
+    'REPORTS_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports_cache')
+)
+try:
+    os.makedirs(REPORTS_CACHE_DIR, exist_ok=True)
+except OSError as e:
+    logger.warning("Could not create report cache dir %s: %s", REPORTS_CACHE_DIR, e)
+
+# Response/query cache - the library data only changes when a report finishes
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 60})
 
 # Initialize Parallel client
 PARALLEL_API_KEY = os.getenv('PARALLEL_API_KEY')
@@ -33,6 +91,19 @@ if not PARALLEL_API_KEY:
 
 client = Parallel(api_key=PARALLEL_API_KEY)
 
+# Shared HTTP session for the Parallel SSE event stream. Keep-alive pooling
+# means reconnects (up to 10 per task in the robust monitor) reuse a warm
+# socket instead of paying a fresh TCP+TLS handshake each time.
+_http = requests.Session()
+_http.mount('https://', HTTPAdapter(
+    pool_connections=20, pool_maxsize=50, max_retries=Retry(total=0)
+))
+_http.headers.update({
+    'Accept': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'parallel-beta': 'events-sse-2025-07-24'
+})
+
 # Initialize OpenAI client for Parallel's chat completions API (used for validation)
 try:
     openai_client = OpenAI(
@@ -42,7 +113,7 @@ try:
         max_retries=3
     )
 except Exception as e:
-    print(f"Warning: Failed to initialize OpenAI client: {e}")
+    logger.warning("Failed to initialize OpenAI client: %s", e)
     openai_client = None
 
 # Email configuration
@@ -84,61 +155,286 @@ def clean_database_url(url):
 
 DATABASE_URL = clean_database_url(DATABASE_URL)
 
-# Initialize connection pool
-connection_pool = None
+# Initialize connection pools (shared by request handlers and background
+# monitor threads - avoids a fresh TCP+auth handshake per query).
+# Reads vastly outnumber writes (the library/index page is queried on every
+# hit while report generation is write-rare), so readers get their own pool
+# of read-only sessions and writers draw from a small dedicated pool.
+READ_POOL_SIZE = 8
+# Writers serve task bookkeeping and the executor's completion workers;
+# bursts beyond the pool size wait in get_conn rather than erroring
+WRITE_POOL_SIZE = 10
+
+# TCP keepalives stop idle pooled connections being silently dropped by
+# NAT/load balancers between Vercel and Supabase, which would otherwise
+# surface as a stall on the next borrow
+_POOL_KWARGS = {
+    'cursor_factory': RealDictCursor,
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3,
+}
+_read_pool = pool.ThreadedConnectionPool(
+    1, READ_POOL_SIZE, DATABASE_URL, **_POOL_KWARGS
+)
+_write_pool = pool.ThreadedConnectionPool(
+    1, WRITE_POOL_SIZE, DATABASE_URL, **_POOL_KWARGS
+)
+
+# getconn raises PoolError immediately when the pool is empty rather than
+# blocking, so borrowers wait up to this long for a connection to come back
+_POOL_BORROW_TIMEOUT = 10.0
+
+@contextmanager
+def get_conn(readonly=False):
+    """Borrow a pooled connection and return it when done.
+
+    Pass readonly=True for query-only helpers so they draw from the larger
+    reader pool and run in read-only sessions. When the pool is exhausted
+    the borrow waits briefly for a returned connection instead of failing
+    the request outright.
+    """
+    source = _read_pool if readonly else _write_pool
+    deadline = time.monotonic() + _POOL_BORROW_TIMEOUT
+    while True:
+        try:
+            conn = source.getconn()
+            break
+        except pool.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+    try:
+        if readonly:
+            conn.set_session(readonly=True)
+        yield conn
+    finally:
+        source.putconn(conn)
 
 # In-memory task tracking for background monitoring
-active_tasks = {}  # {task_run_id: {'metadata': task_metadata, 'thread': thread_obj}}
+active_tasks = {}  # {task_run_id: {'metadata': task_metadata, 'future': future_obj}}
 completed_tasks = set()  # Track completed tasks to prevent duplicate processing
 
+# Server-side task metadata store. Keeping this out of the Flask session
+# means it is no longer signed, base64-encoded and shipped in the cookie on
+# every response; the database row remains the session-independent fallback.
+TASK_META = {}  # {task_run_id: task_metadata}
+_task_meta_lock = threading.Lock()
+
+def set_task_metadata(task_run_id, metadata):
+    with _task_meta_lock:
+        TASK_META[task_run_id] = metadata
+
+def get_task_metadata(task_run_id):
+    with _task_meta_lock:
+        return TASK_META.get(task_run_id)
+
+def pop_task_metadata(task_run_id):
+    with _task_meta_lock:
+        TASK_META.pop(task_run_id, None)
+
+# Bounded pool for background task monitors. Each monitor blocks for the
+# lifetime of its task, so cap workers at the hourly report limit - the
+# logical concurrency ceiling - instead of spawning an unbounded thread
+# per request.
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_REPORTS_PER_HOUR)
+
+# One asyncio loop in a dedicated thread watches every in-flight task via
+# its SSE event stream, so waiting costs a socket poll instead of a blocked
+# thread per task. Blocking SDK calls are still handed off to EXECUTOR.
+_monitor_loop = asyncio.new_event_loop()
+threading.Thread(target=_monitor_loop.run_forever, daemon=True, name='task-monitor-loop').start()
+
+TERMINAL_STATUSES = {'completed', 'failed', 'cancelled'}
+
+async def _watch_task(task_run_id, task_metadata, max_reconnects=10):
+    """Watch one task's SSE stream and finalize it on a terminal status"""
+    loop = asyncio.get_running_loop()
+    reconnects = 0
+
+    while reconnects < max_reconnects:
+        try:
+            timeout = aiohttp.ClientTimeout(connect=10, sock_read=300)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(
+                    f"https://api.parallel.ai/v1beta/tasks/runs/{task_run_id}/events",
+                    headers={
+                        'x-api-key': PARALLEL_API_KEY,
+                        'Accept': 'text/event-stream',
+                        'Cache-Control': 'no-cache',
+                        'parallel-beta': 'events-sse-2025-07-24'
+                    }
+                ) as response:
+                    response.raise_for_status()
+
+                    async for raw_line in response.content:
+                        line = raw_line.rstrip(b'\r\n')
+                        if not line.startswith(b'data:'):
+                            continue
+                        data_line = line[5:].strip()
+                        if not data_line:
+                            continue
+
+                        try:
+                            event_data = json.loads(data_line)
+                        except json.JSONDecodeError:
+                            continue
+
+                        if event_data.get('type') != 'task_run.state':
+                            continue
+
+                        status = event_data.get('run', {}).get('status')
+                        if status in TERMINAL_STATUSES:
+                            logger.debug("Watcher saw terminal status '%s' for task %s", status, task_run_id)
+                            # Result fetch + save block, so run them on the executor;
+                            # the result call returns immediately now that the task is done
+                            await loop.run_in_executor(
+                                EXECUTOR, monitor_task_completion, task_run_id, task_metadata
+                            )
+                            return
+
+        except Exception as e:
+            reconnects += 1
+            wait_time = min(2 ** reconnects, 30)
+            logger.warning("Watcher stream error for task %s (attempt %s/%s): %s, retrying in %ss",
+                           task_run_id, reconnects, max_reconnects, e, wait_time)
+            await asyncio.sleep(wait_time)
+
+    # Stream kept failing - fall back to the blocking monitor so the task
+    # still completes
+    logger.warning("Watcher giving up on SSE for task %s, falling back to blocking monitor", task_run_id)
+    EXECUTOR.submit(monitor_task_completion, task_run_id, task_metadata)
+
+def watch_task_async(task_run_id, task_metadata):
+    """Schedule an SSE watch for a task on the shared monitor loop"""
+    return asyncio.run_coroutine_threadsafe(
+        _watch_task(task_run_id, task_metadata), _monitor_loop
+    )
 
-def get_db_connection():
-    """Get a database connection"""
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
 
 def verify_database_connection():
     """Simple database connection test"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1')
-        cursor.close()
-        conn.close()
-        print("✅ Database connection verified")
+        with get_conn(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        logger.info("✅ Database connection verified")
         return True
     except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+        logger.error("❌ Database connection failed: %s", e)
         return False
 
+def ensure_indexes():
+    """Create the indexes the hot-path queries rely on (idempotent)"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        # Slug lookups (report views and uniqueness checks in create_slug)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reports_slug ON reports(slug)')
+        # Time-filtered rate-limit count runs on every page load
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_rate_limit_created_at ON rate_limit(created_at)')
+        # Library listings are ordered by created_at DESC
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports(created_at DESC)')
+        conn.commit()
+        cursor.close()
+
+# In-process mirror of the last hour of rate_limit rows. The limit check
+# runs on every /generate-report POST and page load; with the cap at
+# MAX_REPORTS_PER_HOUR the answer almost never changes, so serve it from
+# memory and only hit the database once per process to rehydrate.
+#
+# Reports are bucketed per minute as (epoch_minute, count) pairs, so the
+# window holds at most 60 entries regardless of traffic and the running
+# total keeps the count O(1).
+_report_buckets = collections.deque()
+_report_bucket_total = 0
+_report_times_lock = threading.Lock()
+_report_times_loaded = False
+
+def _bump_bucket_locked(epoch_minute):
+    """Add one report to the bucket window (call with lock held)"""
+    global _report_bucket_total
+    if _report_buckets and _report_buckets[-1][0] == epoch_minute:
+        _report_buckets[-1] = (epoch_minute, _report_buckets[-1][1] + 1)
+    else:
+        _report_buckets.append((epoch_minute, 1))
+    _report_bucket_total += 1
+
+def _expire_buckets_locked(now):
+    """Drop buckets older than an hour from the left (call with lock held)"""
+    global _report_bucket_total
+    cutoff_minute = int(now - 3600) // 60
+    while _report_buckets and _report_buckets[0][0] <= cutoff_minute:
+        _report_bucket_total -= _report_buckets.popleft()[1]
+
+def _rehydrate_report_times_locked():
+    """Backfill the in-memory window from the database (call with lock held)"""
+    global _report_bucket_total
+    # Ages rather than absolute timestamps sidestep any timezone mismatch
+    # between the DB server and this process
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT EXTRACT(EPOCH FROM (NOW() - created_at)) AS age
+            FROM rate_limit
+            WHERE created_at > NOW() - INTERVAL '1 hour'
+            ORDER BY created_at
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    now = time.time()
+    _report_buckets.clear()
+    _report_bucket_total = 0
+    for row in rows:
+        _bump_bucket_locked(int(now - float(row['age'])) // 60)
+
+# Tiny TTL cache over the window: under polling load the count changes at
+# most once a second, so most calls can skip the lock entirely
+_recent_count_cache = {'t': 0.0, 'v': 0}
+
+def _note_report_generated():
+    """Add a generation to the in-memory rate-limit window"""
+    with _report_times_lock:
+        if _report_times_loaded:
+            _bump_bucket_locked(int(time.time()) // 60)
+    # Make the new report visible to the next count immediately
+    _recent_count_cache['t'] = 0.0
+
 def get_recent_report_count():
     """Get the number of reports generated in the last hour (global rate limiting)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get count of reports in the last hour
-    one_hour_ago = datetime.datetime.now() - datetime.timedelta(hours=1)
-    cursor.execute('SELECT COUNT(*) as count FROM rate_limit WHERE created_at > %s', (one_hour_ago,))
-    result = cursor.fetchone()
-    
-    cursor.close()
-    conn.close()
-    return result['count'] if result else 0
-
-def record_report_generation():
-    """Record a new report generation for global rate limiting"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('INSERT INTO rate_limit DEFAULT VALUES')
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+    global _report_times_loaded
+    now = time.time()
+
+    if now - _recent_count_cache['t'] < 1.0:
+        return _recent_count_cache['v']
+
+    with _report_times_lock:
+        if not _report_times_loaded:
+            _rehydrate_report_times_locked()
+            _report_times_loaded = True
+
+        _expire_buckets_locked(now)
+        count = _report_bucket_total
+
+    _recent_count_cache['v'] = count
+    _recent_count_cache['t'] = now
+    return count
+
+def _invalidate_library_cache():
+    """Drop cached index page and report listings after library data changes"""
+    try:
+        cache.delete('view//')
+        cache.delete_memoized(get_all_public_reports)
+        cache.delete_memoized(get_all_public_reports_limited)
+    except Exception as e:
+        logger.error("Cache invalidation error: %s", e)
 
 def send_report_ready_email(email, report_title, report_slug, task_id):
     """Send email notification when report is ready using Resend API"""
     if not RESEND_API_KEY or not email:
-        print(f"Skipping email: RESEND_API_KEY={'present' if RESEND_API_KEY else 'missing'}, email={'present' if email else 'missing'}")
+        logger.warning("Skipping email: RESEND_API_KEY=%s, email=%s", 'present' if RESEND_API_KEY else 'missing', 'present' if email else 'missing')
         return False
     
     try:
@@ -176,41 +472,53 @@ def send_report_ready_email(email, report_title, report_slug, task_id):
         )
         
         if response.status_code == 200:
-            print(f"✅ Email sent successfully to {email} for report {report_slug}")
+            logger.info("✅ Email sent successfully to %s for report %s", email, report_slug)
             return True
         else:
-            print(f"❌ Email failed: {response.status_code} - {response.text}")
+            logger.error("❌ Email failed: %s - %s", response.status_code, response.text)
             return False
             
     except Exception as e:
-        print(f"❌ Email sending error: {e}")
+        logger.error("❌ Email sending error: %s", e)
         return False
 
+# Precompiled at module load - create_slug runs on the hot report-creation path
+_SLUG_STRIP = re.compile(r'[^a-zA-Z0-9\s-]')
+_SLUG_WS = re.compile(r'\s+')
+
 def create_slug(title):
     """Create URL-friendly slug from title"""
     # Remove special characters and convert to lowercase
-    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', title)
-    slug = re.sub(r'\s+', '-', slug.strip())
+    slug = _SLUG_STRIP.sub('', title)
+    slug = _SLUG_WS.sub('-', slug.strip())
     slug = slug.lower()
     
     # Ensure uniqueness by checking database
     base_slug = slug
-    counter = 1
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    while True:
-        cursor.execute('SELECT id FROM reports WHERE slug = %s', (slug,))
-        if not cursor.fetchone():
-            break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-    
-    cursor.close()
-    conn.close()
+
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+        slug = _next_unique_slug(cursor, base_slug)
+        cursor.close()
     return slug
 
+def _next_unique_slug(cursor, base_slug):
+    """Find a free slug for base_slug without looping one query per candidate"""
+    cursor.execute('SELECT id FROM reports WHERE slug = %s', (base_slug,))
+    if not cursor.fetchone():
+        return base_slug
+
+    # Base slug taken: pull the highest numeric suffix in a single query
+    # instead of probing -1, -2, ... one round trip at a time
+    suffix_pattern = f'^{re.escape(base_slug)}-([0-9]+)$'
+    cursor.execute(
+        'SELECT MAX(CAST(SUBSTRING(slug FROM %s) AS INTEGER)) AS max_suffix FROM reports WHERE slug ~ %s',
+        (suffix_pattern, suffix_pattern)
+    )
+    row = cursor.fetchone()
+    max_suffix = row['max_suffix'] if row and row['max_suffix'] else 0
+    return f"{base_slug}-{max_suffix + 1}"
+
 def generate_market_research_input(industry, geography, details):
     """Generate research input based on user parameters"""
     geography_text = geography if geography and geography.strip() else "Not specified"
@@ -235,7 +543,16 @@ def convert_basis_to_dict(basis):
     
     result = []
     for field_basis in basis:
-        # Convert FieldBasis object to dictionary
+        # Prefer the SDK's own serializer: pydantic's model_dump runs in
+        # compiled code, skipping the O(fields x citations) getattr walk below
+        if hasattr(field_basis, 'model_dump'):
+            result.append(field_basis.model_dump())
+            continue
+        if hasattr(field_basis, 'dict'):
+            result.append(field_basis.dict())
+            continue
+
+        # Fallback for plain objects: convert FieldBasis to dictionary manually
         basis_dict = {
             'field': getattr(field_basis, 'field', ''),
             'reasoning': getattr(field_basis, 'reasoning', ''),
@@ -257,15 +574,104 @@ def convert_basis_to_dict(basis):
     
     return result
 
-def save_report(title, slug, industry, geography, details, content, basis=None, task_run_id=None):
+def _render_report_markdown(report):
+    """Render a report row into the downloadable markdown document"""
+    # Parts list joined once so the report body (by far the largest piece)
+    # isn't copied through f-string interpolation
+    parts = []
+    # Most reports open with their own markdown heading; only synthesize a
+    # title line when the content doesn't (peek at a slice so the check
+    # never copies the whole body)
+    if not report['content'][:64].lstrip().startswith('#'):
+        parts += ['# ', report['title'], '\n\n']
+    parts += [
+        '**Generated on:** ', str(report['created_at']), '  \n',
+        '**Industry:** ', report['industry'], '  \n',
+        '**Geography:** ', report['geography'] or 'Global', '  \n',
+        '**Details:** ', report['details'] or 'None specified', '\n\n',
+        '---\n\n',
+        report['content'], '\n',
+    ]
+    return ''.join(parts)
+
+def _write_report_cache(slug, markdown):
+    """Best-effort write of rendered markdown to the on-disk download cache"""
+    try:
+        path = os.path.join(REPORTS_CACHE_DIR, f"{slug}.md")
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(markdown)
+    except OSError as e:
+        logger.warning("Could not cache markdown for %s: %s", slug, e)
+
+def save_report_and_record(title, slug, industry, geography, details, content, basis=None, task_run_id=None):
+    """Save a completed report and its rate-limit row in a single transaction
+
+    Every completion path used to run save_report and
+    record_report_generation as two separate transactions on two
+    connections; folding them together means one commit (one fsync) per
+    completed report.
+    """
+    return save_report(title, slug, industry, geography, details, content,
+                       basis, task_run_id, record=True)
+
+def finalize_task(task_run_id, task_metadata, run_result):
+    """Turn a finished task run into a saved report and clean up tracking.
+
+    Shared by every completion path (SSE monitor, background monitor,
+    complete-task endpoint, recovery sweeps) so the title template and the
+    single-transaction save/record sequence live in one place.
+    """
+    content = getattr(run_result.output, "content", "No content found.")
+    basis = getattr(run_result.output, "basis", None)
+
+    # Create title and slug with error handling
+    try:
+        title = f"{task_metadata['industry']} Market Research Report"
+        if task_metadata['geography'] and task_metadata['geography'] != "Not specified":
+            title += f" - {task_metadata['geography']}"
+
+        slug = create_slug(title)
+        logger.info("✅ Generated title='%s', slug='%s' for task %s", title, slug, task_run_id)
+
+    except Exception as e:
+        logger.error("❌ Title/slug generation failed for task %s: %s", task_run_id, e)
+        logger.error("❌ task_metadata: %s", task_metadata)
+        # Create fallback title/slug to prevent NULL
+        title = f"Market Research Report {task_run_id[-8:]}"
+        slug = f"market-report-{task_run_id[-12:]}"
+        logger.info("🔧 Using fallback title='%s', slug='%s'", title, slug)
+
+    report_id = save_report_and_record(
+        title, slug,
+        task_metadata['industry'],
+        task_metadata['geography'],
+        task_metadata['details'],
+        content,
+        basis,
+        task_run_id=task_run_id
+    )
+
+    # Clean up tracking
+    pop_task_metadata(task_run_id)
+    if task_run_id in active_tasks:
+        del active_tasks[task_run_id]
+
+    return {
+        'report_id': report_id,
+        'slug': slug,
+        'title': title,
+        'url': f'/report/{slug}'
+    }
+
+def save_report(title, slug, industry, geography, details, content, basis=None, task_run_id=None, record=False):
     """Complete a task by updating it with final report data"""
     # Final safety check to prevent NULL values reaching database
     if not title or not isinstance(title, str):
-        print(f"⚠️  Invalid title detected: {repr(title)}, creating fallback")
+        logger.warning("⚠️  Invalid title detected: %s, creating fallback", repr(title))
         title = f"Market Research Report {task_run_id[-8:] if task_run_id else 'unknown'}"
     
     if not slug or not isinstance(slug, str):
-        print(f"⚠️  Invalid slug detected: {repr(slug)}, creating fallback")
+        logger.warning("⚠️  Invalid slug detected: %s, creating fallback", repr(slug))
         slug = f"market-report-{task_run_id[-12:] if task_run_id else 'unknown'}"
     
     # Clean content to prevent PostgreSQL errors
@@ -278,7 +684,7 @@ def save_report(title, slug, industry, geography, details, content, basis=None,
         
         if original_length != cleaned_length:
             removed_chars = original_length - cleaned_length
-            print(f"🧹 Cleaned content: removed {removed_chars} problematic character(s)")
+            logger.info("🧹 Cleaned content: removed %s problematic character(s)", removed_chars)
     
     # Clean other string fields as well
     if title and isinstance(title, str):
@@ -292,91 +698,38 @@ def save_report(title, slug, industry, geography, details, content, basis=None,
     if details and isinstance(details, str):
         details = details.replace('\x00', '').replace('\uffff', '')
     
-    print(f"💾 Saving report: title='{title}', slug='{slug}', task_run_id='{task_run_id}'")
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    logger.info("💾 Saving report: title='%s', slug='%s', task_run_id='%s'", title, slug, task_run_id)
     
-    try:
-        # Check if task already completed AND has content (skip only if fully complete)
-        if task_run_id:
-            cursor.execute('SELECT status, content FROM reports WHERE task_run_id = %s', (task_run_id,))
-            existing_task = cursor.fetchone()
-            if existing_task and existing_task['status'] == 'completed' and existing_task['content'] is not None:
-                print(f"Task {task_run_id} already completed with content, skipping duplicate save")
-                cursor.close()
-                conn.close()
-                return task_run_id  # Return task_run_id as report_id
-        
-        # Convert basis to JSON string if provided
-        basis_json = None
-        if basis:
-            try:
-                basis_dict = convert_basis_to_dict(basis)
-                basis_json = json.dumps(basis_dict) if basis_dict else None
-                # Clean basis JSON as well
-                if basis_json and isinstance(basis_json, str):
-                    basis_json = basis_json.replace('\x00', '').replace('\uffff', '')
-            except Exception as e:
-                print(f"Error converting basis to JSON: {e}")
-                basis_json = None
-        
-        # Generate unique ID for slug conflicts
-        report_id = str(uuid.uuid4())
-        
-        # Update existing running task to completed status
-        cursor.execute('''
-            UPDATE reports 
-            SET id = %s, title = %s, slug = %s, content = %s, basis = %s, 
-                status = 'completed', completed_at = CURRENT_TIMESTAMP,
-                is_public = TRUE
-            WHERE task_run_id = %s
-        ''', (report_id, title, slug, content, basis_json, task_run_id))
-        
-        if cursor.rowcount == 0:
-            # Task doesn't exist, create new completed report
-            cursor.execute('''
-                INSERT INTO reports (id, task_run_id, title, slug, industry, geography, details, content, basis, status, completed_at, is_public)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 'completed', CURRENT_TIMESTAMP, TRUE)
-            ''', (report_id, task_run_id, title, slug, industry, geography, details, content, basis_json))
-        
-        conn.commit()
-        print(f"Successfully completed task {task_run_id} with report {report_id}")
-        
-        # Send email notification if email was provided during task creation
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
         try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT email FROM reports WHERE task_run_id = %s', (task_run_id,))
-            email_result = cursor.fetchone()
-            cursor.close()
-            
-            if email_result and email_result['email']:
-                email = email_result['email']
-                print(f"Sending report ready email to {email}")
-                send_report_ready_email(email, title, slug, task_run_id)
-            else:
-                print("No email provided for this task, skipping email notification")
-        except Exception as e:
-            print(f"Error sending email notification: {e}")
-            # Don't fail the report saving if email fails
-        
-        return report_id
-        
-    except psycopg2.IntegrityError as e:
-        # Handle case where slug already exists (create new slug)
-        if "slug" in str(e).lower():
-            # Generate new slug and retry
-            base_slug = slug
-            counter = 1
-            while True:
-                new_slug = f"{base_slug}-{counter}"
-                cursor.execute('SELECT id FROM reports WHERE slug = %s', (new_slug,))
-                if not cursor.fetchone():
-                    slug = new_slug
-                    break
-                counter += 1
-            
-            # Retry with new slug
+            # Check if task already completed AND has content (skip only if fully complete)
+            if task_run_id:
+                cursor.execute('SELECT status, content FROM reports WHERE task_run_id = %s', (task_run_id,))
+                existing_task = cursor.fetchone()
+                if existing_task and existing_task['status'] == 'completed' and existing_task['content'] is not None:
+                    logger.info("Task %s already completed with content, skipping duplicate save", task_run_id)
+                    cursor.close()
+                    return task_run_id  # Return task_run_id as report_id
+
+            # Convert basis to JSON string if provided
+            basis_json = None
+            if basis:
+                try:
+                    basis_dict = convert_basis_to_dict(basis)
+                    basis_json = json.dumps(basis_dict) if basis_dict else None
+                    # Clean basis JSON as well
+                    if basis_json and isinstance(basis_json, str):
+                        basis_json = basis_json.replace('\x00', '').replace('\uffff', '')
+                except Exception as e:
+                    logger.error("Error converting basis to JSON: %s", e)
+                    basis_json = None
+
+            # Generate unique ID for slug conflicts
+            report_id = str(uuid.uuid4())
+
+            # Update existing running task to completed status
             cursor.execute('''
                 UPDATE reports 
                 SET id = %s, title = %s, slug = %s, content = %s, basis = %s, 
@@ -384,476 +737,504 @@ def save_report(title, slug, industry, geography, details, content, basis=None,
                     is_public = TRUE
                 WHERE task_run_id = %s
             ''', (report_id, title, slug, content, basis_json, task_run_id))
-            
+
+            if cursor.rowcount == 0:
+                # Task doesn't exist, create new completed report
+                cursor.execute('''
+                    INSERT INTO reports (id, task_run_id, title, slug, industry, geography, details, content, basis, status, completed_at, is_public)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 'completed', CURRENT_TIMESTAMP, TRUE)
+                ''', (report_id, task_run_id, title, slug, industry, geography, details, content, basis_json))
+
+            if record:
+                # Rate-limit row rides the same transaction as the save, so a
+                # completed report costs one commit. Piggyback prune: only the
+                # last hour is ever counted, so drop older rows here to keep
+                # the table from growing without bound
+                cursor.execute('INSERT INTO rate_limit DEFAULT VALUES')
+                cursor.execute("DELETE FROM rate_limit WHERE created_at < NOW() - INTERVAL '2 hours'")
+
             conn.commit()
-            print(f"Successfully completed task {task_run_id} with adjusted slug {slug}")
-            
+            logger.info("Successfully completed task %s with report %s", task_run_id, report_id)
+            if record:
+                _note_report_generated()
+            _invalidate_library_cache()
+
             # Send email notification if email was provided during task creation
+            email_result = None
             try:
                 cursor = conn.cursor()
-                cursor.execute('SELECT email FROM reports WHERE task_run_id = %s', (task_run_id,))
+                cursor.execute('SELECT email, created_at FROM reports WHERE task_run_id = %s', (task_run_id,))
                 email_result = cursor.fetchone()
                 cursor.close()
-                
+
                 if email_result and email_result['email']:
                     email = email_result['email']
-                    print(f"Sending report ready email to {email}")
+                    logger.info("Sending report ready email to %s", email)
                     send_report_ready_email(email, title, slug, task_run_id)
                 else:
-                    print("No email provided for this task, skipping email notification")
+                    logger.warning("No email provided for this task, skipping email notification")
             except Exception as e:
-                print(f"Error sending email notification: {e}")
+                logger.error("Error sending email notification: %s", e)
                 # Don't fail the report saving if email fails
-            
+
+            # Cache the rendered markdown so /download can serve it from disk
+            _write_report_cache(slug, _render_report_markdown({
+                'title': title,
+                'created_at': email_result['created_at'] if email_result else '',
+                'industry': industry,
+                'geography': geography,
+                'details': details,
+                'content': content,
+            }))
+
             return report_id
-        else:
+
+        except psycopg2.IntegrityError as e:
+            # Handle case where slug already exists (create new slug)
+            if "slug" in str(e).lower():
+                # Clear the aborted transaction, then pick a fresh suffix and retry
+                conn.rollback()
+                slug = _next_unique_slug(cursor, slug)
+
+                # Retry with new slug
+                cursor.execute('''
+                    UPDATE reports 
+                    SET id = %s, title = %s, slug = %s, content = %s, basis = %s, 
+                        status = 'completed', completed_at = CURRENT_TIMESTAMP,
+                        is_public = TRUE
+                    WHERE task_run_id = %s
+                ''', (report_id, title, slug, content, basis_json, task_run_id))
+
+                if record:
+                    # Same single-transaction rate-limit row and prune as the
+                    # normal path
+                    cursor.execute('INSERT INTO rate_limit DEFAULT VALUES')
+                    cursor.execute("DELETE FROM rate_limit WHERE created_at < NOW() - INTERVAL '2 hours'")
+
+                conn.commit()
+                logger.info("Successfully completed task %s with adjusted slug %s", task_run_id, slug)
+                if record:
+                    _note_report_generated()
+                _invalidate_library_cache()
+
+                # Send email notification if email was provided during task creation
+                email_result = None
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute('SELECT email, created_at FROM reports WHERE task_run_id = %s', (task_run_id,))
+                    email_result = cursor.fetchone()
+                    cursor.close()
+
+                    if email_result and email_result['email']:
+                        email = email_result['email']
+                        logger.info("Sending report ready email to %s", email)
+                        send_report_ready_email(email, title, slug, task_run_id)
+                    else:
+                        logger.warning("No email provided for this task, skipping email notification")
+                except Exception as e:
+                    logger.error("Error sending email notification: %s", e)
+                    # Don't fail the report saving if email fails
+
+                # Cache the rendered markdown so /download can serve it from disk
+                _write_report_cache(slug, _render_report_markdown({
+                    'title': title,
+                    'created_at': email_result['created_at'] if email_result else '',
+                    'industry': industry,
+                    'geography': geography,
+                    'details': details,
+                    'content': content,
+                }))
+
+                return report_id
+            else:
+                raise e
+        except Exception as e:
+            conn.rollback()
             raise e
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+        finally:
+            cursor.close()
 
 def repair_null_slug_report(task_run_id):
     """Repair a report with NULL slug using available data"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Get the report with NULL title/slug
-        cursor.execute('''
-            SELECT industry, geography, content 
-            FROM reports 
-            WHERE task_run_id = %s AND (title IS NULL OR slug IS NULL) AND content IS NOT NULL
-        ''', (task_run_id,))
-        
-        result = cursor.fetchone()
-        if not result:
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        try:
+            # Get the report with NULL title/slug
+            cursor.execute('''
+                SELECT industry, geography, content 
+                FROM reports 
+                WHERE task_run_id = %s AND (title IS NULL OR slug IS NULL) AND content IS NOT NULL
+            ''', (task_run_id,))
+
+            result = cursor.fetchone()
+            if not result:
+                return None
+
+            # Generate title and slug from available data
+            industry = result['industry'] or f"Report {task_run_id[-8:]}"
+            geography = result['geography']
+
+            title = f"{industry} Market Research Report"
+            if geography and geography.strip() and geography != "Not specified":
+                title += f" - {geography}"
+
+            slug = create_slug(title)
+
+            # Update the record
+            cursor.execute('''
+                UPDATE reports 
+                SET title = %s, slug = %s 
+                WHERE task_run_id = %s
+            ''', (title, slug, task_run_id))
+
+            conn.commit()
+            logger.info("🔧 Auto-repaired NULL slug report %s: title='%s', slug='%s'", task_run_id, title, slug)
+
+            cursor.close()
+            return {'title': title, 'slug': slug}
+
+        except Exception as e:
+            logger.error("❌ Failed to repair NULL slug report %s: %s", task_run_id, e)
+            conn.rollback()
+            cursor.close()
             return None
-            
-        # Generate title and slug from available data
-        industry = result['industry'] or f"Report {task_run_id[-8:]}"
-        geography = result['geography']
-        
-        title = f"{industry} Market Research Report"
-        if geography and geography.strip() and geography != "Not specified":
-            title += f" - {geography}"
-            
-        slug = create_slug(title)
-        
-        # Update the record
-        cursor.execute('''
-            UPDATE reports 
-            SET title = %s, slug = %s 
-            WHERE task_run_id = %s
-        ''', (title, slug, task_run_id))
-        
-        conn.commit()
-        print(f"🔧 Auto-repaired NULL slug report {task_run_id}: title='{title}', slug='{slug}'")
-        
-        cursor.close()
-        conn.close()
-        return {'title': title, 'slug': slug}
-        
-    except Exception as e:
-        print(f"❌ Failed to repair NULL slug report {task_run_id}: {e}")
-        conn.rollback()
-        cursor.close()
-        conn.close()
-        return None
 
+# Report queries hoisted to module level so the hot read paths don't
+# rebuild the SQL strings per call (the row mapping itself already comes
+# for free from the pool-wide RealDictCursor)
+_REPORT_BY_SLUG_SQL = '''
+    SELECT id, title, industry, geography, details, content, basis, created_at, task_run_id
+    FROM reports WHERE slug = %s AND is_public = %s
+'''
+
+_PUBLIC_REPORTS_SQL = '''
+    SELECT id, title, slug, industry, geography, created_at
+    FROM reports WHERE is_public = %s AND status = 'completed'
+    ORDER BY created_at DESC
+'''
+
+_PUBLIC_REPORTS_LIMITED_SQL = _PUBLIC_REPORTS_SQL + '    LIMIT %s\n'
+
+_LIBRARY_COLORS = ['#FF6B35', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9']
+
+@cache.memoize(3600)
 def get_report_by_slug(slug):
     """Get report by slug (public access) with auto-repair for broken links"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Handle broken email links from NULL slug reports
-    if slug == "None":
-        print("🔧 Detected broken email link (/report/None), searching for NULL slug report to repair...")
-        
-        # Find the most recent NULL slug report
-        cursor.execute('''
-            SELECT task_run_id, industry, geography
-            FROM reports 
-            WHERE slug IS NULL AND content IS NOT NULL AND status = 'completed'
-            ORDER BY completed_at DESC
-            LIMIT 1
-        ''', ())
-        
-        null_result = cursor.fetchone()
-        if null_result:
-            task_run_id = null_result['task_run_id']
-            print(f"🔧 Found NULL slug report {task_run_id}, attempting auto-repair...")
-            
-            # Try to repair it
-            repair_result = repair_null_slug_report(task_run_id)
-            if repair_result:
-                # Successfully repaired, use the new slug
-                slug = repair_result['slug']
-                print(f"✅ Auto-repaired and redirecting to: /report/{slug}")
-    
-    cursor.execute('''
-        SELECT id, title, industry, geography, details, content, basis, created_at, task_run_id
-        FROM reports WHERE slug = %s AND is_public = %s
-    ''', (slug, True))
-    
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    
-    if result:
-        # Parse basis JSON if it exists
-        basis_data = None
-        if result['basis']:  # basis column
-            try:
-                basis_data = json.loads(result['basis'])
-            except (json.JSONDecodeError, TypeError):
-                basis_data = None
-                
-        return {
-            'id': result['id'],
-            'title': result['title'],
-            'industry': result['industry'],
-            'geography': result['geography'],
-            'details': result['details'],
-            'content': result['content'],
-            'basis': basis_data,
-            'created_at': result['created_at'],
-            'task_run_id': result['task_run_id'],
-            'slug': slug
-        }
-    return None
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
 
+        # Handle broken email links from NULL slug reports
+        if slug == "None":
+            logger.info("🔧 Detected broken email link (/report/None), searching for NULL slug report to repair...")
+
+            # Find the most recent NULL slug report
+            cursor.execute('''
+                SELECT task_run_id, industry, geography
+                FROM reports 
+                WHERE slug IS NULL AND content IS NOT NULL AND status = 'completed'
+                ORDER BY completed_at DESC
+                LIMIT 1
+            ''', ())
+
+            null_result = cursor.fetchone()
+            if null_result:
+                task_run_id = null_result['task_run_id']
+                logger.info("🔧 Found NULL slug report %s, attempting auto-repair...", task_run_id)
+
+                # Try to repair it
+                repair_result = repair_null_slug_report(task_run_id)
+                if repair_result:
+                    # Successfully repaired, use the new slug
+                    slug = repair_result['slug']
+                    logger.info("✅ Auto-repaired and redirecting to: /report/%s", slug)
+
+        cursor.execute(_REPORT_BY_SLUG_SQL, (slug, True))
+
+        result = cursor.fetchone()
+        cursor.close()
+
+        if result:
+            # Parse basis JSON if it exists
+            basis_data = None
+            if result['basis']:  # basis column
+                try:
+                    basis_data = json.loads(result['basis'])
+                except (json.JSONDecodeError, TypeError):
+                    basis_data = None
+
+            report = dict(result)
+            report['basis'] = basis_data
+            report['slug'] = slug
+            return report
+        return None
+
+@cache.memoize(60)
 def get_all_public_reports():
     """Get all public reports for the library"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, title, slug, industry, geography, created_at
-        FROM reports WHERE is_public = %s AND status = 'completed'
-        ORDER BY created_at DESC
-    ''', (True,))
-    
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    
-    # Add color for each report
-    colors = ['#FF6B35', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9']
-    
-    return [{
-        'id': row['id'],
-        'title': row['title'],
-        'slug': row['slug'],
-        'industry': row['industry'],
-        'geography': row['geography'],
-        'created_at': row['created_at'],
-        'company_color': colors[i % len(colors)]
-    } for i, row in enumerate(results)]
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_PUBLIC_REPORTS_SQL, (True,))
+
+        results = cursor.fetchall()
+        cursor.close()
+
+        # Rows are already mappings (RealDictCursor); just tack on a color
+        return [{**row, 'company_color': _LIBRARY_COLORS[i % len(_LIBRARY_COLORS)]}
+                for i, row in enumerate(results)]
 
+@cache.memoize(60)
 def get_all_public_reports_limited(limit):
     """Get limited public reports for the library"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, title, slug, industry, geography, created_at
-        FROM reports WHERE is_public = %s AND status = 'completed'
-        ORDER BY created_at DESC
-        LIMIT %s
-    ''', (True, limit))
-    
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    
-    # Add color for each report (like in original function)
-    colors = ['#FF6B35', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9']
-    
-    return [{
-        'id': row['id'],
-        'title': row['title'],
-        'slug': row['slug'],
-        'industry': row['industry'],
-        'geography': row['geography'],
-        'created_at': row['created_at'],
-        'company_color': colors[i % len(colors)]
-    } for i, row in enumerate(results)]
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_PUBLIC_REPORTS_LIMITED_SQL, (True, limit))
+
+        results = cursor.fetchall()
+        cursor.close()
+
+        # Rows are already mappings (RealDictCursor); just tack on a color
+        return [{**row, 'company_color': _LIBRARY_COLORS[i % len(_LIBRARY_COLORS)]}
+                for i, row in enumerate(results)]
 
 def save_running_task(task_run_id, industry, geography, details, session_id, email=None):
     """Save running task to unified reports table"""
-    print(f"DEBUG: save_running_task called with: {task_run_id}, {industry}, {geography}, {details}, {session_id}, {email}")
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Check if task already exists
-        cursor.execute('SELECT task_run_id FROM reports WHERE task_run_id = %s', (task_run_id,))
-        if cursor.fetchone():
-            # Update existing task
-            cursor.execute('''
-                UPDATE reports 
-                SET status = 'running', created_at = CURRENT_TIMESTAMP, email = %s
-                WHERE task_run_id = %s
-            ''', (email, task_run_id))
-        else:
-            # Insert new task (id will be NULL for running tasks)
-            cursor.execute('''
-                INSERT INTO reports (task_run_id, industry, geography, details, status, session_id, email)
-                VALUES (%s, %s, %s, %s, 'running', %s, %s)
-            ''', (task_run_id, industry, geography, details, session_id, email))
-        
-        rows_affected = cursor.rowcount
-        conn.commit()
-        print(f"SUCCESS: Saved running task {task_run_id} to reports table (rows affected: {rows_affected})")
-        
-        # Verify it was saved
-        cursor.execute('SELECT status FROM reports WHERE task_run_id = %s', (task_run_id,))
-        result = cursor.fetchone()
-        print(f"VERIFY: Task {task_run_id} status in DB: {result['status'] if result else 'NOT FOUND'}")
-        
-    except Exception as e:
-        print(f"ERROR saving running task {task_run_id}: {e}")
-        print(f"ERROR details: {type(e).__name__}: {str(e)}")
-        conn.rollback()
-    finally:
-        cursor.close()
-        conn.close()
+    logger.debug("DEBUG: save_running_task called with: %s, %s, %s, %s, %s, %s", task_run_id, industry, geography, details, session_id, email)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        try:
+            # Check if task already exists
+            cursor.execute('SELECT task_run_id FROM reports WHERE task_run_id = %s', (task_run_id,))
+            if cursor.fetchone():
+                # Update existing task
+                cursor.execute('''
+                    UPDATE reports 
+                    SET status = 'running', created_at = CURRENT_TIMESTAMP, email = %s
+                    WHERE task_run_id = %s
+                ''', (email, task_run_id))
+            else:
+                # Insert new task (id will be NULL for running tasks)
+                cursor.execute('''
+                    INSERT INTO reports (task_run_id, industry, geography, details, status, session_id, email)
+                    VALUES (%s, %s, %s, %s, 'running', %s, %s)
+                ''', (task_run_id, industry, geography, details, session_id, email))
+
+            rows_affected = cursor.rowcount
+            conn.commit()
+            logger.info("SUCCESS: Saved running task %s to reports table (rows affected: %s)", task_run_id, rows_affected)
+
+            # Verify it was saved
+            cursor.execute('SELECT status FROM reports WHERE task_run_id = %s', (task_run_id,))
+            result = cursor.fetchone()
+            logger.debug("VERIFY: Task %s status in DB: %s", task_run_id, result['status'] if result else 'NOT FOUND')
+
+        except Exception as e:
+            logger.error("ERROR saving running task %s: %s", task_run_id, e)
+            logger.error("ERROR details: %s: %s", type(e).__name__, str(e))
+            conn.rollback()
+        finally:
+            cursor.close()
 
 def get_running_tasks():
     """Get all running tasks from unified reports table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # Check for old running or failed tasks and verify their actual status with Parallel API
     four_hours_ago = datetime.datetime.now() - datetime.timedelta(hours=4)
-    
-    # Find old running or failed tasks that might need status verification
-    cursor.execute('''
-        SELECT task_run_id, industry, geography, details, created_at, status
-        FROM reports 
-        WHERE (status = 'running' OR status = 'failed') AND created_at < %s
-    ''', (four_hours_ago,))
-    old_tasks = cursor.fetchall()
-    
+
+    # Find old running or failed tasks that might need status verification.
+    # Read on the reader pool and release before the recovery work below -
+    # finalize_task and the batch UPDATE borrow writer connections of their
+    # own, and holding one across those nested borrows would eat into the
+    # write pool for no reason.
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_run_id, industry, geography, details, created_at, status
+            FROM reports
+            WHERE (status = 'running' OR status = 'failed') AND created_at < %s
+        ''', (four_hours_ago,))
+        old_tasks = cursor.fetchall()
+        cursor.close()
+
+    not_found_tasks = []
     if old_tasks:
-        print(f"🔍 Found {len(old_tasks)} old running/failed tasks, checking actual status...")
+        logger.error("🔍 Found %s old running/failed tasks, checking actual status...", len(old_tasks))
         for task in old_tasks:
             task_run_id = task['task_run_id']
-            print(f"   - Checking task {task_run_id}: {task['industry']} (status: {task['status']}, started {task['created_at']})")
-            
+            logger.info("   - Checking task %s: %s (status: %s, started %s)", task_run_id, task['industry'], task['status'], task['created_at'])
+
             # Check actual task status with Parallel API
             try:
                 run_result = client.task_run.result(task_run_id)
                 # If we get here, task is complete - save the report
-                print(f"   ✅ Task {task_run_id} actually completed, saving report...")
-                
-                content = getattr(run_result.output, "content", "No content found.")
-                basis = getattr(run_result.output, "basis", None)
-                
-                # Create title and slug
-                title = f"{task['industry']} Market Research Report"
-                if task['geography'] and task['geography'] != "Not specified":
-                    title += f" - {task['geography']}"
-                
-                slug = create_slug(title)
-                
-                # Save the completed report
-                report_id = save_report(
-                    title, slug,
-                    task['industry'],
-                    task['geography'], 
-                    task['details'],
-                    content,
-                    basis,
-                    task_run_id=task_run_id
-                )
-                
-                record_report_generation()
-                print(f"   ✅ Saved report {report_id} for task {task_run_id}")
-                
+                logger.info("   ✅ Task %s actually completed, saving report...", task_run_id)
+
+                result = finalize_task(task_run_id, task, run_result)
+
+                logger.info("   ✅ Saved report %s for task %s", result['report_id'], task_run_id)
+
             except Exception as e:
                 # Task is still running, queued, or failed - check the actual error
                 error_str = str(e).lower()
                 if 'not found' in error_str or 'invalid' in error_str:
                     # Task doesn't exist in Parallel API - might be a database inconsistency
-                    print(f"   ❌ Task {task_run_id} not found in Parallel API - marking as failed")
-                    cursor.execute('''
-                        UPDATE reports 
-                        SET status = 'failed', error_message = 'Task not found in Parallel API', completed_at = CURRENT_TIMESTAMP
-                        WHERE task_run_id = %s
-                    ''', (task_run_id,))
+                    logger.error("   ❌ Task %s not found in Parallel API - marking as failed", task_run_id)
+                    not_found_tasks.append(task_run_id)
                 else:
                     # Task exists but still processing (queued/running) - leave it alone
-                    print(f"   ⏳ Task {task_run_id} still processing in Parallel API: {e}")
+                    logger.info("   ⏳ Task %s still processing in Parallel API: %s", task_run_id, e)
                     # Don't mark as timed out - let it continue
-    
+
+    if not_found_tasks:
+        # Mark every API-orphaned task failed in one write transaction
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE reports
+                SET status = 'failed', error_message = 'Task not found in Parallel API', completed_at = CURRENT_TIMESTAMP
+                WHERE task_run_id = ANY(%s)
+            ''', (not_found_tasks,))
+            conn.commit()
+            cursor.close()
+
     # Check for failed tasks that might need retry (separate from the recovery above)
     retry_failed_tasks()
-    
+
     # Get all running tasks
-    cursor.execute('''
-        SELECT task_run_id, industry, geography, details, created_at
-        FROM reports 
-        WHERE status = 'running'
-        ORDER BY created_at DESC
-    ''')
-    
-    results = cursor.fetchall()
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    return [{
-        'task_run_id': row['task_run_id'],
-        'industry': row['industry'],
-        'geography': row['geography'],
-        'details': row['details'],
-        'created_at': row['created_at']
-    } for row in results]
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_run_id, industry, geography, details, created_at
+            FROM reports
+            WHERE status = 'running'
+            ORDER BY created_at DESC
+        ''')
+        results = cursor.fetchall()
+        cursor.close()
+
+    return [dict(row) for row in results]
 
 def retry_failed_tasks():
     """Check for failed tasks and retry them if they failed due to recoverable errors"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Find tasks that failed due to recoverable errors (not too old)
-    cursor.execute('''
-        SELECT task_run_id, industry, geography, details, error_message, created_at
-        FROM reports 
-        WHERE status = 'failed' 
-        AND error_message IS NOT NULL
-        AND (
-            error_message ILIKE '%timeout%' OR 
-            error_message ILIKE '%connection%' OR 
-            error_message ILIKE '%network%' OR 
-            error_message ILIKE '%server error%' OR
-            error_message ILIKE '%Task timed out%'
-        )
-        AND created_at > NOW() - INTERVAL '24 hours'  -- Only retry recent failures
-        AND created_at < NOW() - INTERVAL '1 hour'    -- But not too recent (give them time)
-    ''')
-    
-    failed_tasks = cursor.fetchall()
-    
-    if failed_tasks:
-        print(f"🔄 Found {len(failed_tasks)} failed tasks with recoverable errors, retrying...")
-        for task in failed_tasks:
-            task_run_id = task['task_run_id']
-            print(f"   - Retrying task {task_run_id}: {task['industry']} (failed: {task['error_message']})")
-            
-            # Reset task status to running for retry
-            cursor.execute('''
-                UPDATE reports 
-                SET status = 'running', error_message = NULL, completed_at = NULL
-                WHERE task_run_id = %s
-            ''', (task_run_id,))
-            
-            # Start background monitoring for the retry
-            task_metadata = {
-                'industry': task['industry'],
-                'geography': task['geography'],
-                'details': task['details']
-            }
-            
-            monitor_thread = threading.Thread(
-                target=monitor_task_completion,
-                args=(task_run_id, task_metadata),
-                daemon=True
-            )
-            monitor_thread.start()
-            
-            # Track active task
-            active_tasks[task_run_id] = {
-                'metadata': task_metadata,
-                'thread': monitor_thread,
-                'start_time': datetime.datetime.now()
-            }
-            
-            print(f"   ✅ Restarted monitoring for task {task_run_id}")
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
 
-def update_task_status(task_run_id, status, error_message=None):
-    """Update task status in unified reports table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
+        # Find tasks that failed due to recoverable errors (not too old)
         cursor.execute('''
-            UPDATE reports 
-            SET status = %s, 
-                completed_at = CASE WHEN %s != 'running' THEN CURRENT_TIMESTAMP ELSE completed_at END,
-                error_message = %s
-            WHERE task_run_id = %s
-        ''', (status, status, error_message, task_run_id))
-        
+            SELECT task_run_id, industry, geography, details, error_message, created_at
+            FROM reports 
+            WHERE status = 'failed' 
+            AND error_message IS NOT NULL
+            AND (
+                error_message ILIKE '%timeout%' OR 
+                error_message ILIKE '%connection%' OR 
+                error_message ILIKE '%network%' OR 
+                error_message ILIKE '%server error%' OR
+                error_message ILIKE '%Task timed out%'
+            )
+            AND created_at > NOW() - INTERVAL '24 hours'  -- Only retry recent failures
+            AND created_at < NOW() - INTERVAL '1 hour'    -- But not too recent (give them time)
+        ''')
+
+        failed_tasks = cursor.fetchall()
+
+        if failed_tasks:
+            logger.error("🔄 Found %s failed tasks with recoverable errors, retrying...", len(failed_tasks))
+            for task in failed_tasks:
+                task_run_id = task['task_run_id']
+                logger.error("   - Retrying task %s: %s (failed: %s)", task_run_id, task['industry'], task['error_message'])
+
+                # Reset task status to running for retry
+                cursor.execute('''
+                    UPDATE reports 
+                    SET status = 'running', error_message = NULL, completed_at = NULL
+                    WHERE task_run_id = %s
+                ''', (task_run_id,))
+
+                # Start background monitoring for the retry
+                task_metadata = {
+                    'industry': task['industry'],
+                    'geography': task['geography'],
+                    'details': task['details']
+                }
+
+                monitor_future = watch_task_async(task_run_id, task_metadata)
+
+                # Track active task
+                active_tasks[task_run_id] = {
+                    'metadata': task_metadata,
+                    'future': monitor_future,
+                    'start_time': datetime.datetime.now()
+                }
+
+                logger.info("   ✅ Restarted monitoring for task %s", task_run_id)
+
         conn.commit()
-        print(f"Updated task {task_run_id} status to: {status}")
-    except Exception as e:
-        print(f"Error updating task {task_run_id} status: {e}")
-        conn.rollback()
-    finally:
         cursor.close()
-        conn.close()
+
+def update_task_status(task_run_id, status, error_message=None):
+    """Update task status in unified reports table"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                UPDATE reports 
+                SET status = %s, 
+                    completed_at = CASE WHEN %s != 'running' THEN CURRENT_TIMESTAMP ELSE completed_at END,
+                    error_message = %s
+                WHERE task_run_id = %s
+            ''', (status, status, error_message, task_run_id))
+
+            conn.commit()
+            logger.info("Updated task %s status to: %s", task_run_id, status)
+        except Exception as e:
+            logger.error("Error updating task %s status: %s", task_run_id, e)
+            conn.rollback()
+        finally:
+            cursor.close()
 
 def check_task_exists_session_independent(task_run_id):
     """Check if task exists without session dependency"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if task exists in reports table
-    cursor.execute('SELECT industry, geography, details, status FROM reports WHERE task_run_id = %s', (task_run_id,))
-    result = cursor.fetchone()
-    
-    cursor.close()
-    conn.close()
-    
-    if result:
-        return {
-            'industry': result['industry'],
-            'geography': result['geography'],
-            'details': result['details'],
-            'status': result['status']
-        }
-    return None
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+
+        # Check if task exists in reports table
+        cursor.execute('SELECT industry, geography, details, status FROM reports WHERE task_run_id = %s', (task_run_id,))
+        result = cursor.fetchone()
+
+        cursor.close()
+
+        if result:
+            return dict(result)
+        return None
 
 def get_recently_completed_reports_for_session(session_id):
     """Get recently completed reports for a session (last 24 hours)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get reports completed in last 24 hours that were started by this session
-    one_day_ago = datetime.datetime.now() - datetime.timedelta(hours=24)
-    
-    cursor.execute('''
-        SELECT r.title, r.slug, r.industry, r.geography, r.created_at
-        FROM reports r
-        WHERE r.task_run_id IN (
-            SELECT task_run_id FROM active_tasks 
-            WHERE session_id = %s AND created_at > %s
-        )
-        AND r.created_at > %s
-        ORDER BY r.created_at DESC
-        LIMIT 5
-    ''', (session_id, one_day_ago, one_day_ago))
-    
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    
-    return [{
-        'title': row['title'],
-        'slug': row['slug'],
-        'industry': row['industry'],
-        'geography': row['geography'],
-        'created_at': row['created_at']
-    } for row in results]
+    with get_conn(readonly=True) as conn:
+        cursor = conn.cursor()
+
+        # Get reports completed in last 24 hours that were started by this session
+        one_day_ago = datetime.datetime.now() - datetime.timedelta(hours=24)
+
+        cursor.execute('''
+            SELECT r.title, r.slug, r.industry, r.geography, r.created_at
+            FROM reports r
+            WHERE r.task_run_id IN (
+                SELECT task_run_id FROM active_tasks 
+                WHERE session_id = %s AND created_at > %s
+            )
+            AND r.created_at > %s
+            ORDER BY r.created_at DESC
+            LIMIT 5
+        ''', (session_id, one_day_ago, one_day_ago))
+
+        results = cursor.fetchall()
+        cursor.close()
+
+        return [dict(row) for row in results]
 
 
 def validate_form_inputs(industry, geography, details, debug=False):
@@ -950,7 +1331,7 @@ Return your analysis in the specified JSON format.
         )
         
         if response.status_code != 200:
-            print(f"Parallel API error: {response.status_code} - {response.text}")
+            logger.error("Parallel API error: %s - %s", response.status_code, response.text)
             # Fail safe - if API is down, allow input to pass
             if debug:
                 return True, None, {'error': f'API error: {response.status_code}'}
@@ -989,7 +1370,7 @@ Return your analysis in the specified JSON format.
             return True, None
         
     except json.JSONDecodeError as e:
-        print(f"JSON parsing error in validation: {e}")
+        logger.error("JSON parsing error in validation: %s", e)
         debug_info = {'error': f'JSON parsing error: {e}'} if debug else None
         # If we can't parse the response, allow the input to be safe
         if debug:
@@ -998,7 +1379,7 @@ Return your analysis in the specified JSON format.
             return True, None
         
     except Exception as e:
-        print(f"Validation error: {e}")
+        logger.error("Validation error: %s", e)
         debug_info = {'error': f'Validation error: {e}'} if debug else None
         # If validation fails for any reason, allow the input to be safe
         if debug:
@@ -1008,6 +1389,7 @@ Return your analysis in the specified JSON format.
 
 
 @app.route('/')
+@cache.cached(timeout=60)
 def index():
     """Main page with public report library and report generation"""
     # Get running tasks first
@@ -1022,7 +1404,7 @@ def index():
     public_reports = get_all_public_reports_limited(max_public_reports)
     
     # Debug logging
-    print(f"Index route - Active tasks: {active_tasks_count}, Max public reports: {max_public_reports}, Got public reports: {len(public_reports)}")
+    logger.debug("Index route - Active tasks: %s, Max public reports: %s, Got public reports: %s", active_tasks_count, max_public_reports, len(public_reports))
     
     # Get current rate limit status
     recent_report_count = get_recent_report_count()
@@ -1030,7 +1412,7 @@ def index():
     recently_completed = []  # Simplify for now
     
     # Debug logging
-    print(f"Index route - active_tasks found: {len(active_tasks_for_library)}")
+    logger.debug("Index route - active_tasks found: %s", len(active_tasks_for_library))
     
     return render_template('index.html', 
                          recent_report_count=recent_report_count,
@@ -1090,25 +1472,21 @@ def generate_report():
             'details': details
         }
         
-        # Store in session for completion handling
-        session[f'task_{task_run.run_id}'] = task_metadata
+        # Store server-side for completion handling
+        set_task_metadata(task_run.run_id, task_metadata)
         
         # Use task_run_id as the session identifier (much simpler!)
         save_running_task(task_run.run_id, industry, geography, details, task_run.run_id, email)
-        print(f"Generate report - saving task {task_run.run_id} with session_id: {task_run.run_id}, email: {email}")
-        
-        # Start background monitoring thread as ultimate fallback
-        monitor_thread = threading.Thread(
-            target=monitor_task_completion,
-            args=(task_run.run_id, task_metadata),
-            daemon=True
-        )
-        monitor_thread.start()
+        logger.debug("Generate report - saving task %s with session_id: %s, email: %s", task_run.run_id, task_run.run_id, email)
         
+        # Watch for completion on the shared event loop (constant thread
+        # count; falls back to a blocking monitor if the stream fails)
+        monitor_future = watch_task_async(task_run.run_id, task_metadata)
+
         # Track active task
         active_tasks[task_run.run_id] = {
             'metadata': task_metadata,
-            'thread': monitor_thread,
+            'future': monitor_future,
             'start_time': datetime.datetime.now()
         }
         
@@ -1122,38 +1500,46 @@ def generate_report():
     except Exception as e:
         return jsonify({'error': f'Failed to generate report: {str(e)}'}), 500
 
+# Compact encoder bound once for the SSE path - no per-event encoder lookup,
+# no pretty-printing whitespace on the wire
+_dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+def _sse_event(event):
+    """Format one event as a ready-to-send SSE bytes frame"""
+    return b'data: ' + _dumps(event).encode('utf-8') + b'\n\n'
+
 @app.route('/stream-events/<task_run_id>')
 def stream_events(task_run_id):
     """Stream real-time events from a task run via SSE with robust error handling"""
-    print(f"SSE request for task {task_run_id}")
+    logger.debug("SSE request for task %s", task_run_id)
     
-    task_metadata = session.get(f'task_{task_run_id}')
+    task_metadata = get_task_metadata(task_run_id)
     if not task_metadata:
         # Try to get from database for session-independent access
         task_metadata = check_task_exists_session_independent(task_run_id)
         if not task_metadata:
-            print(f"SSE: Task metadata not found for {task_run_id}")
+            logger.debug("SSE: Task metadata not found for %s", task_run_id)
             def not_found_error():
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Task not found'})}\n\n"
+                yield _sse_event({'type': 'error', 'message': 'Task not found'})
             response = Response(not_found_error(), mimetype='text/event-stream')
             response.headers['Cache-Control'] = 'no-cache'
             return response
     
-    print(f"SSE: Starting stream for task {task_run_id}")
+    logger.debug("SSE: Starting stream for task %s", task_run_id)
     
     def generate_events():
         # Use robust SSE stream handler
         try:
             for event in stream_task_events(task_run_id, PARALLEL_API_KEY):
-                yield f"data: {json.dumps(event)}\n\n"
+                yield _sse_event(event)
                 
                 # Stop streaming if task completed
                 if event.get('type') == 'task.status' and event.get('is_complete'):
                     return
                     
         except Exception as e:
-            print(f"SSE: Stream failed with error: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Stream failed: {str(e)}'})}\n\n"
+            logger.error("SSE: Stream failed with error: %s", e)
+            yield _sse_event({'type': 'error', 'message': f'Stream failed: {str(e)}'})
     
     response = Response(generate_events(), mimetype='text/event-stream')
     response.headers['Cache-Control'] = 'no-cache'
@@ -1169,49 +1555,55 @@ def stream_task_events(task_id, api_key):
     - Yield events as generator
     - Handle connection errors
     """
-    headers = {
-        'x-api-key': api_key,
-        'Accept': 'text/event-stream',
-        'Cache-Control': 'no-cache',
-        'parallel-beta': 'events-sse-2025-07-24'
-    }
-    
     stream_url = f"https://api.parallel.ai/v1beta/tasks/runs/{task_id}/events"
-    
+
     try:
         # Use separate timeouts: (connection_timeout, read_timeout)
         # Connection: 10s (should be fast), Read: 300s (allow for natural gaps in task processing)
-        with requests.get(stream_url, headers=headers, stream=True, timeout=(10, 300)) as response:
+        # Stream headers are preset on the shared session; only the key varies
+        with _http.get(stream_url, headers={'x-api-key': api_key}, stream=True, timeout=(10, 300)) as response:
             response.raise_for_status()
             
             current_event_type = None
-            buffer = ""
-            
-            for line in response.iter_lines(decode_unicode=True):
-                if line is None:
+            # Byte-level line buffer: split raw chunks on b'\n' and decode
+            # only what we actually use, instead of letting iter_lines
+            # scan and decode every line in Python on this hot loop
+            buffer = bytearray()
+
+            for chunk in response.iter_content(chunk_size=8192):
+                if not chunk:
                     continue
-                    
-                # Handle SSE format
-                if line.startswith('event:'):
-                    current_event_type = line[6:].strip()
-                elif line.startswith('data:'):
-                    data_line = line[5:].strip()
-                    if data_line:
-                        try:
-                            # Parse JSON data
-                            event_data = json.loads(data_line)
-                            
-                            # Process event based on type
-                            processed_event = process_task_event(current_event_type, event_data)
-                            if processed_event:
-                                yield processed_event
-                                
-                        except json.JSONDecodeError as e:
-                            print(f"Failed to parse SSE event data: {data_line}, error: {e}")
-                            continue
-                elif line == "":
-                    # Empty line indicates end of event
-                    current_event_type = None
+                buffer += chunk
+
+                # Process every completed line; keep the partial tail buffered
+                while True:
+                    newline = buffer.find(b'\n')
+                    if newline == -1:
+                        break
+                    line = bytes(buffer[:newline]).rstrip(b'\r')
+                    del buffer[:newline + 1]
+
+                    # Handle SSE format
+                    if line.startswith(b'event:'):
+                        current_event_type = line[6:].strip().decode('utf-8')
+                    elif line.startswith(b'data:'):
+                        data_line = line[5:].strip()
+                        if data_line:
+                            try:
+                                # Parse JSON data (json.loads accepts bytes)
+                                event_data = json.loads(data_line)
+
+                                # Process event based on type
+                                processed_event = process_task_event(current_event_type, event_data)
+                                if processed_event:
+                                    yield processed_event
+
+                            except json.JSONDecodeError as e:
+                                logger.error("Failed to parse SSE event data: %s, error: %s", data_line, e)
+                                continue
+                    elif not line:
+                        # Empty line indicates end of event
+                        current_event_type = None
                     
     except requests.RequestException as e:
         # Let the caller handle connection errors
@@ -1219,79 +1611,92 @@ def stream_task_events(task_id, api_key):
     except Exception as e:
         raise RuntimeError(f"Unexpected error in SSE stream: {str(e)}")
 
+def _handle_state_event(event_data):
+    run_info = event_data.get('run', {})
+    status = run_info.get('status', 'unknown')
+
+    return {
+        'type': 'task.status',
+        'status': status,
+        'is_complete': status in ['completed', 'failed', 'cancelled'],
+        'message': f"Task status: {status}",
+        'category': 'status'
+    }
+
+def _handle_progress_stats_event(event_data):
+    source_stats = event_data.get('source_stats', {})
+    num_sources = source_stats.get('num_sources_read', 0)
+    total_sources = source_stats.get('num_sources_considered', 0)
+
+    return {
+        'type': 'task.progress',
+        'sources_processed': num_sources,
+        'sources_total': total_sources,
+        'message': f"Processed {num_sources} of {total_sources} sources",
+        'category': 'progress',
+        'recent_sources': source_stats.get('sources_read_sample', [])[-5:]  # Last 5
+    }
+
+def _handle_progress_msg_event(event_data):
+    msg_type = event_data.get('type', '').split('.')[-1]  # Get last part after dot
+
+    # Check if this progress_msg event has source data
+    source_stats = event_data.get('source_stats', {})
+
+    processed = {
+        'type': 'task.log',
+        'log_level': msg_type,
+        'message': event_data.get('message', ''),
+        'category': 'log'
+    }
+
+    # Add source data if available in progress_msg events
+    if source_stats:
+        num_sources = source_stats.get('num_sources_read', 0)
+        total_sources = source_stats.get('num_sources_considered', 0)
+        processed.update({
+            'sources_processed': num_sources,
+            'sources_total': total_sources,
+            'recent_sources': source_stats.get('sources_read_sample', [])[-5:]  # Last 5
+        })
+
+    return processed
+
+def _handle_unknown_event(event_data):
+    return {
+        'type': 'task.unknown',
+        'message': event_data.get('message', str(event_data)),
+        'category': 'unknown'
+    }
+
+# Dispatch table for the hot streaming loop - one dict lookup per event
+# instead of a cascade of type comparisons
+_EVENT_HANDLERS = {
+    'task_run.state': _handle_state_event,
+    'task_run.progress_stats': _handle_progress_stats_event,
+}
+
 def process_task_event(event_type, event_data):
     """
     Process different event types from Parallel API
     Returns standardized event format for frontend
     """
+    etype = event_data.get('type', event_type) or ''
+
     # Debug logging to understand event structure
-    print(f"Processing event type: {event_data.get('type', event_type)}")
+    logger.debug("Processing event type: %s", etype)
     if 'source_stats' in event_data:
-        print(f"Source stats found: {event_data.get('source_stats')}")
-    
+        logger.debug("Source stats found: %s", event_data.get('source_stats'))
+
+    handler = _EVENT_HANDLERS.get(etype)
+    if handler is None:
+        handler = _handle_progress_msg_event if 'progress_msg' in etype else _handle_unknown_event
+
     processed = {
         'timestamp': event_data.get('timestamp'),
-        'raw_type': event_data.get('type', event_type)
+        'raw_type': etype
     }
-    
-    # Handle different event types
-    if event_data.get('type') == 'task_run.state':
-        run_info = event_data.get('run', {})
-        status = run_info.get('status', 'unknown')
-        
-        processed.update({
-            'type': 'task.status',
-            'status': status,
-            'is_complete': status in ['completed', 'failed', 'cancelled'],
-            'message': f"Task status: {status}",
-            'category': 'status'
-        })
-        
-    elif event_data.get('type') == 'task_run.progress_stats':
-        source_stats = event_data.get('source_stats', {})
-        num_sources = source_stats.get('num_sources_read', 0)
-        total_sources = source_stats.get('num_sources_considered', 0)
-        
-        processed.update({
-            'type': 'task.progress',
-            'sources_processed': num_sources,
-            'sources_total': total_sources,
-            'message': f"Processed {num_sources} of {total_sources} sources",
-            'category': 'progress',
-            'recent_sources': source_stats.get('sources_read_sample', [])[-5:]  # Last 5
-        })
-        
-    elif 'progress_msg' in event_data.get('type', ''):
-        msg_type = event_data.get('type', '').split('.')[-1]  # Get last part after dot
-        
-        # Check if this progress_msg event has source data
-        source_stats = event_data.get('source_stats', {})
-        
-        processed.update({
-            'type': 'task.log',
-            'log_level': msg_type,
-            'message': event_data.get('message', ''),
-            'category': 'log'
-        })
-        
-        # Add source data if available in progress_msg events
-        if source_stats:
-            num_sources = source_stats.get('num_sources_read', 0)
-            total_sources = source_stats.get('num_sources_considered', 0)
-            processed.update({
-                'sources_processed': num_sources,
-                'sources_total': total_sources,
-                'recent_sources': source_stats.get('sources_read_sample', [])[-5:]  # Last 5
-            })
-        
-    else:
-        # Handle unknown event types
-        processed.update({
-            'type': 'task.unknown',
-            'message': event_data.get('message', str(event_data)),
-            'category': 'unknown'
-        })
-    
+    processed.update(handler(event_data))
     return processed
 
 @app.route('/monitor-task/<task_run_id>', methods=['POST'])
@@ -1306,7 +1711,7 @@ def monitor_task_with_sse(task_run_id):
     """
     try:
         # Check if task exists in session first, then database
-        task_metadata = session.get(f'task_{task_run_id}')
+        task_metadata = get_task_metadata(task_run_id)
         if not task_metadata:
             # Try to get from database for session-independent access
             task_metadata = check_task_exists_session_independent(task_run_id)
@@ -1323,7 +1728,7 @@ def monitor_task_with_sse(task_run_id):
         if task_completed and final_status == 'completed':
             # Check if this task has already been completed by another monitoring system
             if task_run_id in completed_tasks:
-                print(f"Task {task_run_id} already completed by another monitoring system")
+                logger.info("Task %s already completed by another monitoring system", task_run_id)
                 return jsonify({
                     'success': True,
                     'task_completed': True,
@@ -1336,51 +1741,13 @@ def monitor_task_with_sse(task_run_id):
             # Fetch final result and save report
             try:
                 run_result = client.task_run.result(task_run_id)
-                content = getattr(run_result.output, "content", "No content found.")
-                basis = getattr(run_result.output, "basis", None)
-                
-                # Create and save report with error handling
-                try:
-                    title = f"{task_metadata['industry']} Market Research Report"
-                    if task_metadata['geography'] and task_metadata['geography'] != "Not specified":
-                        title += f" - {task_metadata['geography']}"
-                    
-                    slug = create_slug(title)
-                    print(f"✅ Generated title='{title}', slug='{slug}' for task {task_run_id}")
-                    
-                except Exception as e:
-                    print(f"❌ Title/slug generation failed for task {task_run_id}: {e}")
-                    print(f"❌ task_metadata: {task_metadata}")
-                    # Create fallback title/slug to prevent NULL
-                    title = f"Market Research Report {task_run_id[-8:]}"
-                    slug = f"market-report-{task_run_id[-12:]}"
-                    print(f"🔧 Using fallback title='{title}', slug='{slug}'")
-                
-                report_id = save_report(
-                    title, slug,
-                    task_metadata['industry'],
-                    task_metadata['geography'], 
-                    task_metadata['details'],
-                    content,
-                    basis,
-                    task_run_id=task_run_id
-                )
-                
-                record_report_generation()
-                
-                # Clean up
-                session.pop(f'task_{task_run_id}', None)
-                if task_run_id in active_tasks:
-                    del active_tasks[task_run_id]
+                result = finalize_task(task_run_id, task_metadata, run_result)
                 # Status already updated to 'completed' by save_report function
-                
+
                 return jsonify({
                     'success': True,
                     'task_completed': True,
-                    'report_id': report_id,
-                    'slug': slug,
-                    'title': title,
-                    'url': f'/report/{slug}'
+                    **result
                 })
                 
             except Exception as e:
@@ -1411,11 +1778,11 @@ def monitor_task_completion_robust(task_id, api_key, max_reconnects=10):
     error_msg = None
     reconnect_count = 0
     
-    print(f"Starting robust monitoring for task {task_id}")
+    logger.debug("Starting robust monitoring for task %s", task_id)
     
     while not task_completed and reconnect_count < max_reconnects:
         try:
-            print(f"Monitoring attempt {reconnect_count + 1}/{max_reconnects}")
+            logger.debug("Monitoring attempt %s/%s", reconnect_count + 1, max_reconnects)
             
             # Stream events with timeout
             for event in stream_task_events(task_id, api_key):
@@ -1424,12 +1791,12 @@ def monitor_task_completion_robust(task_id, api_key, max_reconnects=10):
                     task_completed = event.get('is_complete', False)
                     
                     if task_completed:
-                        print(f"Task {task_id} completed with status: {final_status}")
+                        logger.info("Task %s completed with status: %s", task_id, final_status)
                         return task_completed, final_status, None
                         
                 elif event.get('type') == 'error':
                     error_msg = event.get('message', 'Unknown error')
-                    print(f"Task {task_id} error: {error_msg}")
+                    logger.error("Task %s error: %s", task_id, error_msg)
                     
                     # Check if this is a recoverable error
                     if is_recoverable_error(error_msg):
@@ -1439,13 +1806,13 @@ def monitor_task_completion_robust(task_id, api_key, max_reconnects=10):
                         
         except (ConnectionError, requests.RequestException) as e:
             # Network errors are recoverable
-            print(f"Connection error for task {task_id}: {e}")
+            logger.error("Connection error for task %s: %s", task_id, e)
             reconnect_count += 1
             
             if reconnect_count < max_reconnects:
                 # Exponential backoff: wait_time = min(2 ** retry_count, 30)
                 wait_time = min(2 ** reconnect_count, 30)
-                print(f"Waiting {wait_time}s before reconnection attempt {reconnect_count + 1}")
+                logger.info("Waiting %ss before reconnection attempt %s", wait_time, reconnect_count + 1)
                 time.sleep(wait_time)
             else:
                 error_msg = f"Max reconnection attempts reached after {max_reconnects} tries"
@@ -1453,47 +1820,42 @@ def monitor_task_completion_robust(task_id, api_key, max_reconnects=10):
         except Exception as e:
             # Unexpected errors
             error_msg = f"Unexpected monitoring error: {str(e)}"
-            print(f"Unexpected error for task {task_id}: {e}")
+            logger.error("Unexpected error for task %s: %s", task_id, e)
             break
     
     # Final status check if monitoring failed
     if not task_completed:
         try:
-            print(f"Performing final status check for task {task_id}")
+            logger.info("Performing final status check for task %s", task_id)
             run_result = client.task_run.result(task_id)
             return True, 'completed', None
         except Exception as e:
-            print(f"Final status check failed for task {task_id}: {e}")
+            logger.error("Final status check failed for task %s: %s", task_id, e)
             return False, 'failed', error_msg or f"Monitoring failed after {max_reconnects} attempts"
     
     return task_completed, final_status, error_msg
 
+# Compiled alternations: one C-level scan per class instead of up to
+# sixteen Python substring checks (and a .lower() copy) per error
+_NON_RECOVERABLE = re.compile(
+    r'unauthorized|forbidden|not found|invalid task|task failed|cancelled|quota exceeded',
+    re.IGNORECASE
+)
+_RECOVERABLE = re.compile(
+    r'connection|timeout|network|stream|disconnected|server error|service unavailable|gateway timeout',
+    re.IGNORECASE
+)
+
 def is_recoverable_error(error_message):
     """
     Classify errors as recoverable (network) vs non-recoverable (task failed)
     """
-    error_lower = error_message.lower()
-    
-    # Non-recoverable errors
-    non_recoverable = [
-        'unauthorized', 'forbidden', 'not found', 'invalid task',
-        'task failed', 'cancelled', 'quota exceeded'
-    ]
-    
-    for pattern in non_recoverable:
-        if pattern in error_lower:
-            return False
-    
-    # Recoverable errors (network, timeout, etc.)
-    recoverable = [
-        'connection', 'timeout', 'network', 'stream', 'disconnected',
-        'server error', 'service unavailable', 'gateway timeout'
-    ]
-    
-    for pattern in recoverable:
-        if pattern in error_lower:
-            return True
-    
+    if _NON_RECOVERABLE.search(error_message):
+        return False
+
+    if _RECOVERABLE.search(error_message):
+        return True
+
     # Default to recoverable for unknown errors
     return True
 
@@ -1502,7 +1864,7 @@ def get_task_status(task_run_id):
     """Get current task status for polling fallback"""
     try:
         # Check if task exists in session first, then database
-        task_metadata = session.get(f'task_{task_run_id}')
+        task_metadata = get_task_metadata(task_run_id)
         if not task_metadata:
             # Try to get from database for session-independent access
             task_metadata = check_task_exists_session_independent(task_run_id)
@@ -1548,74 +1910,44 @@ def monitor_task_completion(task_run_id, task_metadata):
     This is the ultimate fallback to ensure tasks complete even if SSE fails.
     """
     try:
-        print(f"Starting background monitoring for task {task_run_id}")
+        logger.debug("Starting background monitoring for task %s", task_run_id)
         
         # Use the blocking call to wait for completion
         run_result = client.task_run.result(task_run_id)
         
         # If we reach here, the task completed
-        print(f"Background monitor detected completion for task {task_run_id}")
+        logger.info("Background monitor detected completion for task %s", task_run_id)
         
         # Check if task has already been completed by another monitoring system
         if task_run_id in completed_tasks:
-            print(f"Task {task_run_id} already completed by another monitoring system, background monitor exiting")
+            logger.info("Task %s already completed by another monitoring system, background monitor exiting", task_run_id)
             return
         
         # Check if task is still being tracked (not already completed via SSE)
         if task_run_id in active_tasks:
-            print(f"Task {task_run_id} completed via background monitor - saving report")
+            logger.info("Task %s completed via background monitor - saving report", task_run_id)
             
             # Mark as completed to prevent other systems from processing
             completed_tasks.add(task_run_id)
             
             # Save the report (same logic as complete_task endpoint)
             try:
-                content = getattr(run_result.output, "content", "No content found.")
-                basis = getattr(run_result.output, "basis", None)
-                
-                # Create title and slug with error handling
-                try:
-                    title = f"{task_metadata['industry']} Market Research Report"
-                    if task_metadata['geography'] and task_metadata['geography'] != "Not specified":
-                        title += f" - {task_metadata['geography']}"
-                    
-                    slug = create_slug(title)
-                    print(f"✅ Background monitor generated title='{title}', slug='{slug}' for task {task_run_id}")
-                    
-                except Exception as e:
-                    print(f"❌ Background monitor title/slug generation failed for task {task_run_id}: {e}")
-                    print(f"❌ task_metadata: {task_metadata}")
-                    # Create fallback title/slug to prevent NULL
-                    title = f"Market Research Report {task_run_id[-8:]}"
-                    slug = f"market-report-{task_run_id[-12:]}"
-                    print(f"🔧 Background monitor using fallback title='{title}', slug='{slug}'")
-                
-                report_id = save_report(
-                    title, slug, 
-                    task_metadata['industry'], 
-                    task_metadata['geography'], 
-                    task_metadata['details'], 
-                    content,
-                    basis,
-                    task_run_id=task_run_id
-                )
-                
-                record_report_generation()
-                
-                print(f"Background monitor saved report {report_id} for task {task_run_id}")
+                result = finalize_task(task_run_id, task_metadata, run_result)
+
+                logger.info("Background monitor saved report %s for task %s", result['report_id'], task_run_id)
                 
                 # Task completed successfully - status already updated by save_report
                 
             except Exception as e:
-                print(f"Error saving report in background monitor for task {task_run_id}: {e}")
-                print(f"Task {task_run_id} will remain in active_tasks for retry")
+                logger.error("Error saving report in background monitor for task %s: %s", task_run_id, e)
+                logger.info("Task %s will remain in active_tasks for retry", task_run_id)
         
         # Clean up in-memory tracking regardless
         if task_run_id in active_tasks:
             del active_tasks[task_run_id]
             
     except Exception as e:
-        print(f"Error in background monitor for task {task_run_id}: {e}")
+        logger.error("Error in background monitor for task %s: %s", task_run_id, e)
         # Clean up tracking even on error
         if task_run_id in active_tasks:
             del active_tasks[task_run_id]
@@ -1626,14 +1958,14 @@ def complete_task(task_run_id):
     try:
         # Check if this task has already been completed by another monitoring system
         if task_run_id in completed_tasks:
-            print(f"Task {task_run_id} already completed by another monitoring system")
+            logger.info("Task %s already completed by another monitoring system", task_run_id)
             return jsonify({
                 'success': True,
                 'message': 'Task already completed'
             })
         
         # Get task metadata from session OR database
-        task_metadata = session.get(f'task_{task_run_id}')
+        task_metadata = get_task_metadata(task_run_id)
         if not task_metadata:
             # Try to get from database using our session-independent function
             db_task = check_task_exists_session_independent(task_run_id)
@@ -1649,62 +1981,25 @@ def complete_task(task_run_id):
         # Mark as completed to prevent other systems from processing
         completed_tasks.add(task_run_id)
             
-        # Get the final result
+        # Get the final result, save the report and clean up
         run_result = client.task_run.result(task_run_id)
-        
-        # Extract content
-        content = getattr(run_result.output, "content", "No content found.")
-        basis = getattr(run_result.output, "basis", None)
-        
-        # Create title and slug with error handling
-        try:
-            title = f"{task_metadata['industry']} Market Research Report"
-            if task_metadata['geography'] and task_metadata['geography'] != "Not specified":
-                title += f" - {task_metadata['geography']}"
-            
-            slug = create_slug(title)
-            print(f"✅ Complete task generated title='{title}', slug='{slug}' for task {task_run_id}")
-            
-        except Exception as e:
-            print(f"❌ Complete task title/slug generation failed for task {task_run_id}: {e}")
-            print(f"❌ task_metadata: {task_metadata}")
-            # Create fallback title/slug to prevent NULL
-            title = f"Market Research Report {task_run_id[-8:]}"
-            slug = f"market-report-{task_run_id[-12:]}"
-            print(f"🔧 Complete task using fallback title='{title}', slug='{slug}'")
-        
-        # Save report
-        report_id = save_report(
-            title, slug, 
-            task_metadata['industry'], 
-            task_metadata['geography'], 
-            task_metadata['details'], 
-            content,
-            basis,
-            task_run_id=task_run_id
-        )
-        
-        # Record report generation for rate limiting
-        record_report_generation()
-        
-        # Clean up session and active tasks tracking
-        session.pop(f'task_{task_run_id}', None)
-        if task_run_id in active_tasks:
-            del active_tasks[task_run_id]
+        result = finalize_task(task_run_id, task_metadata, run_result)
         # Status already updated to 'completed' by save_report function
-        
+
         return jsonify({
             'success': True,
-            'report_id': report_id,
-            'slug': slug,
-            'title': title,
-            'url': f'/report/{slug}'
+            **result
         })
         
     except Exception as e:
         return jsonify({'error': f'Failed to complete task: {str(e)}'}), 500
 
+def _cacheable_report_response(response):
+    """Don't cache 404s - the slug may simply not exist yet"""
+    return not (isinstance(response, tuple) and len(response) > 1 and response[1] == 404)
+
 @app.route('/report/<slug>')
+@cache.cached(timeout=3600, response_filter=_cacheable_report_response)
 def view_report(slug):
     """View a specific report by slug"""
     report = get_report_by_slug(slug)
@@ -1731,33 +2026,59 @@ def repair_report_endpoint(task_run_id):
 @app.route('/download/<slug>')
 def download_report(slug):
     """Download report as markdown file"""
+    # Markdown compresses roughly 3-4x; stdlib gzip keeps this dependency-free
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+    # Identity-encoding requests can come straight off the on-disk cache:
+    # no DB fetch, no render, conditional 304s from the file stat, and the
+    # X-Sendfile/sendfile(2) path when it's enabled
+    # ?raw=1 returns the stored content as-is, without the generated header
+    raw = request.args.get('raw') == '1'
+
+    cached_name = f"{secure_filename(slug)}.md"
+    if not raw and not use_gzip and os.path.isfile(os.path.join(REPORTS_CACHE_DIR, cached_name)):
+        response = send_from_directory(
+            REPORTS_CACHE_DIR, cached_name, as_attachment=True,
+            download_name=cached_name, mimetype='text/markdown', conditional=True
+        )
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
     report = get_report_by_slug(slug)
-    
+
     if not report:
-        return jsonify({'error': 'Report not found'}), 404
-    
-    # Create temporary file
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.md')
-    
-    # Write markdown content
-    markdown_content = f"""# {report['title']}
+        return Response(b'{"error":"Report not found"}', status=404, mimetype='application/json')
 
-**Generated on:** {report['created_at']}  
-**Industry:** {report['industry']}  
-**Geography:** {report['geography'] or 'Global'}  
-**Details:** {report['details'] or 'None specified'}
+    if raw:
+        # Skip the header build entirely; the content string goes straight out
+        response = Response(report['content'], mimetype='text/markdown')
+        response.headers['Content-Disposition'] = f'attachment; filename="{report["slug"]}.md"'
+        return response
 
----
+    # Serve straight from memory - the content is already a string, so the
+    # old temp-file write/reopen round trip (whose delete=False files were
+    # never unlinked) was pure overhead
+    body = _render_report_markdown(report).encode('utf-8')
+
+    if use_gzip:
+        body = gzip.compress(body, compresslevel=6)
+
+    buf = io.BytesIO(body)
+    buf.seek(0)
 
-{report['content']}
-"""
-    
-    temp_file.write(markdown_content)
-    temp_file.close()
-    
-    # Send file
     filename = f"{report['slug']}.md"
-    return send_file(temp_file.name, as_attachment=True, download_name=filename)
+    response = send_file(buf, as_attachment=True, download_name=filename, mimetype='text/markdown')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+
+    # Reports are immutable once saved, so id + created_at makes a stable
+    # validator; send_file can't derive one from a BytesIO on its own.
+    # make_conditional turns a matching If-None-Match into an empty 304.
+    response.set_etag(f"{report['id']}-{report['created_at']}")
+    if isinstance(report['created_at'], datetime.datetime):
+        response.last_modified = report['created_at']
+    return response.make_conditional(request)
 
 @app.route('/api/validate-inputs', methods=['POST'])
 def validate_inputs_api():
@@ -1794,26 +2115,38 @@ def validate_inputs_api():
             })
             
     except Exception as e:
-        print(f"Validation API error: {e}")
+        logger.error("Validation API error: %s", e)
         return jsonify({
             'is_valid': True,  # Default to valid on error to not block users
             'message': 'Validation unavailable',
             'type': 'error'
         })
 
+# The status payload has a fixed shape with only two varying integers, so
+# the whole body is one bytes template - no dict build, no serializer.
+# authenticated/login_required stay false: no authentication required.
+_STATUS_BODY = (
+    b'{"authenticated":false,"recent_report_count":%d,'
+    b'"max_reports_per_hour":%d,"remaining_reports":%d,"login_required":false}'
+)
+
 @app.route('/api/status')
 def api_status():
     """API endpoint to check global rate limit status"""
     recent_report_count = get_recent_report_count()
-    remaining_reports = MAX_REPORTS_PER_HOUR - recent_report_count
-    
-    return jsonify({
-        'authenticated': False,  # No authentication required
-        'recent_report_count': recent_report_count,
-        'max_reports_per_hour': MAX_REPORTS_PER_HOUR,
-        'remaining_reports': max(0, remaining_reports),
-        'login_required': False
-    })
+    body = _STATUS_BODY % (
+        recent_report_count,
+        MAX_REPORTS_PER_HOUR,
+        max(0, MAX_REPORTS_PER_HOUR - recent_report_count)
+    )
+    response = Response(body, mimetype='application/json')
+
+    # Pollers may hold the answer for a few seconds, and since the body is
+    # fully determined by the count, the count itself is the ETag - repeat
+    # polls with If-None-Match collapse to empty 304s
+    response.headers['Cache-Control'] = 'public, max-age=5'
+    response.set_etag(str(recent_report_count))
+    return response.make_conditional(request)
 
 @app.route('/api/library-html')
 def get_library_html():
@@ -1923,7 +2256,7 @@ def get_library_html():
         ''', public_reports=public_reports, active_tasks=active_tasks_for_library)
         
     except Exception as e:
-        print(f"Library HTML generation error: {e}")
+        logger.error("Library HTML generation error: %s", e)
         # Return minimal fallback HTML instead of JSON error
         return '''
         <div class="analyses-grid">
@@ -1942,7 +2275,7 @@ def get_active_tasks_api():
     """Get active tasks for the current session"""
     try:
         active_tasks_list = get_running_tasks()
-        print(f"API active-tasks - found: {len(active_tasks_list)} tasks")
+        logger.debug("API active-tasks - found: %s tasks", len(active_tasks_list))
         
         # Check each task status with Parallel API
         for task in active_tasks_list:
@@ -1950,44 +2283,15 @@ def get_active_tasks_api():
                 # Try to get task result to check if completed
                 run_result = client.task_run.result(task['task_run_id'])
                 # If we get here, task is complete - save full report
-                print(f"API detected completed task {task['task_run_id']} - saving report")
+                logger.info("API detected completed task %s - saving report", task['task_run_id'])
                 
-                content = getattr(run_result.output, "content", "No content found.")
-                basis = getattr(run_result.output, "basis", None)
-                
-                # Create title and slug with error handling
-                try:
-                    title = f"{task['industry']} Market Research Report"
-                    if task['geography'] and task['geography'] != "Not specified":
-                        title += f" - {task['geography']}"
-                    
-                    slug = create_slug(title)
-                    print(f"✅ API generated title='{title}', slug='{slug}' for task {task['task_run_id']}")
-                    
-                except Exception as e:
-                    print(f"❌ API title/slug generation failed for task {task['task_run_id']}: {e}")
-                    print(f"❌ task data: {task}")
-                    # Create fallback title/slug to prevent NULL
-                    title = f"Market Research Report {task['task_run_id'][-8:]}"
-                    slug = f"market-report-{task['task_run_id'][-12:]}"
-                    print(f"🔧 API using fallback title='{title}', slug='{slug}'")
-                
-                report_id = save_report(
-                    title, slug, 
-                    task['industry'], 
-                    task['geography'], 
-                    task['details'], 
-                    content,
-                    basis,
-                    task_run_id=task['task_run_id']
-                )
-                
-                record_report_generation()
-                print(f"API saved report {report_id} for completed task {task['task_run_id']}")
+                result = finalize_task(task['task_run_id'], task, run_result)
+
+                logger.info("API saved report %s for completed task %s", result['report_id'], task['task_run_id'])
                 task['status'] = 'completed'
             except Exception as e:
                 # Task is still running or error accessing result
-                print(f"Task {task['task_run_id']} still running or error: {e}")
+                logger.error("Task %s still running or error: %s", task['task_run_id'], e)
                 task['status'] = 'running'
         
         # Filter out completed tasks
@@ -2006,10 +2310,20 @@ def get_active_tasks_api():
 # Verify database connection on import for serverless deployment
 try:
     verify_database_connection()
+    ensure_indexes()
 except Exception as e:
-    print(f"Database connection error: {e}")
+    logger.error("Database connection error: %s", e)
 
 
 if __name__ == '__main__':
-    # Run the application locally
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Run the application locally. Debug mode is opt-in via FLASK_DEBUG=1;
+    # the reloader is kept off either way since it forks a second process
+    # that re-runs the import-time DB setup and background threads
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    app.run(
+        debug=debug,
+        use_reloader=False,
+        threaded=True,
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 5000))
+    )